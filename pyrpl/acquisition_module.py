@@ -239,7 +239,7 @@ class AcquisitionModule(Module):
         """
         self._start_trace_acquisition()
         await self._data_ready_async(min_delay_ms)
-        return self._get_trace()
+        return await self._get_trace_async()
 
     def single_async(self):
         """
@@ -448,6 +448,13 @@ class AcquisitionModule(Module):
         """
         raise NotImplementedError  # pragma: no cover
 
+    async def _get_trace_async(self):
+        """
+        get the curve from the instrument without blocking the event loop.
+        By default, this is the same as _get_trace().
+        """
+        return self._get_trace()
+
     def _start_trace_acquisition(self):
         """
         If anything has to be communicated to the hardware (such as make
@@ -152,6 +152,17 @@ def make_asg(channel=0):
             "start_phase",
         ]
         _setup_attributes = _gui_attributes + ["cycles_per_burst"]
+        # the control register 0x0 holds the self-clearing reset bits
+        _host_owned_registers = [
+            "output_direct",
+            "amplitude",
+            "frequency",
+            "start_phase",
+            "cycles_per_burst",
+            "bursts",
+            "delay_between_bursts",
+            "_counter_wrap",
+        ]
 
         _DATA_OFFSET = set_DATA_OFFSET
         _VALUE_OFFSET = set_VALUE_OFFSET
@@ -213,6 +213,8 @@ class DspModule(HardwareModule, SignalModule):
         r.iq0.output_direct = 'out1'
     """
 
+    _host_owned_registers = ["input", "output_direct"]
+
     def __init__(self, rp, name):
         self._number = DSP_INPUTS[name]
         self.addr_base = dsp_addr_base(name)
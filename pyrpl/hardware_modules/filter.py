@@ -3,6 +3,8 @@ from .dsp import DspModule
 
 
 class FilterModule(DspModule):
+    _host_owned_registers = DspModule._host_owned_registers + ["inputfilter"]
+
     inputfilter = FilterRegister(
         0x120,
         filterstages=0x220,
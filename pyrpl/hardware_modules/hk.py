@@ -22,6 +22,7 @@ class HK(HardwareModule):
         + ["expansion_N" + str(i) + "_output" for i in range(8)]
     )
     _gui_attributes = _setup_attributes
+    _host_owned_registers = ["led", "digital_loop"]
     addr_base = 0x40000000
     # We need all attributes to be there when the interpreter is done reading the class
     # (for metaclass to workout)
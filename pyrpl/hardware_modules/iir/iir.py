@@ -300,6 +300,8 @@ class IIR(FilterModule):
         # "_setup_unity",
         # "_setup_zero",
     ]
+    # overflow_bitfield is set by the fpga and must always be read from it
+    _host_owned_registers = FilterModule._host_owned_registers + ["loops", "on"]
 
     loops = IntRegister(
         0x100,
@@ -269,6 +269,19 @@ class Iq(FilterModule):
     ]
 
     _gui_attributes = _setup_attributes  # + ["synchronize_iqs"]
+    _host_owned_registers = FilterModule._host_owned_registers + [
+        "on",
+        "frequency",
+        "bandwidth",
+        "quadrature_factor",
+        "output_signal",
+        "amplitude",
+        "phase",
+        "_g1",
+        "_g4",
+        "_na_averages",
+        "_na_sleepcycles",
+    ]
     # function calls auto-gui only works in develop-0.9.3 branch
 
     _delay = 5  # bare delay of IQ module with no filters set (cycles)
@@ -247,6 +247,15 @@ class Pid(FilterModule):
         "differential_mode_enabled",
     ]
     _gui_attributes = _setup_attributes + ["ival"]
+    # ival is modified by the integrator and must always be read from the fpga
+    _host_owned_registers = FilterModule._host_owned_registers + [
+        "setpoint",
+        "p",
+        "i",
+        "max_voltage",
+        "min_voltage",
+        "pause_gains",
+    ]
 
     # the function is here so the metaclass generates a setup(**kwds) function
     def _setup(self):
@@ -29,6 +29,7 @@ class Pwm(DspModule):
     _setup_attributes = ["input"]
 
     _gui_attributes = _setup_attributes
+    _host_owned_registers = ["input"]
 
     def __init__(self, rp, name=None):
         super().__init__(rp, name=dict(pwm0="in1", pwm1="in2")[name])
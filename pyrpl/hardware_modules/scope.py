@@ -248,6 +248,17 @@ class Scope(HardwareModule, AcquisitionModule):
     # running_state last for proper acquisition setup
     _setup_attributes = _gui_attributes + ["rolling_mode"]
     # changing these resets the acquisition and autoscale (calls setup())
+    # the control register 0x0 and the trigger source 0x4 are reset by the fpga
+    _host_owned_registers = [
+        "input1",
+        "input2",
+        "threshold",
+        "hysteresis",
+        "decimation",
+        "average",
+        "trigger_debounce",
+        "_trigger_delay_register",
+    ]
 
     data_length = data_length  # to use it in a list comprehension
 
@@ -504,23 +515,26 @@ class Scope(HardwareModule, AcquisitionModule):
         if new is not None:
             self.stop()
 
+    @staticmethod
+    def _to_rawdata(values):
+        """converts the register values of a data buffer to signed integers"""
+        x = np.array(values, dtype=np.int16)
+        x[x >= 2**13] -= 2**14
+        return x
+
     @property
     def _rawdata_ch1(self):
         """raw data from ch1"""
         # return np.array([self.to_pyint(v) for v in self._reads(0x10000,
         # self.data_length)],dtype=np.int32)
-        x = np.array(self._reads(0x10000, self.data_length), dtype=np.int16)
-        x[x >= 2**13] -= 2**14
-        return x
+        return self._to_rawdata(self._reads(0x10000, self.data_length))
 
     @property
     def _rawdata_ch2(self):
         """raw data from ch2"""
         # return np.array([self.to_pyint(v) for v in self._reads(0x20000,
         # self.data_length)],dtype=np.int32)
-        x = np.array(self._reads(0x20000, self.data_length), dtype=np.int16)
-        x[x >= 2**13] -= 2**14
-        return x
+        return self._to_rawdata(self._reads(0x20000, self.data_length))
 
     @property
     def _data_ch1(self):
@@ -637,6 +651,16 @@ class Scope(HardwareModule, AcquisitionModule):
         """
         return np.array((self._get_ch(1), self._get_ch(2)))
 
+    async def _get_trace_async(self):
+        """
+        Same as _get_trace(), but both channels are read concurrently
+        without blocking the event loop (with an AsyncMonitorClient)
+        """
+        shift = -(self._write_pointer_trigger + self._trigger_delay_register + 1)
+        ch1 = self._reads_async(0x10000, self.data_length)
+        ch2 = self._reads_async(0x20000, self.data_length)
+        return np.array([np.roll(self._to_rawdata(await ch), shift) / 2**13 for ch in (ch1, ch2)])
+
     def _remaining_time(self):
         """
         :returns curve duration - ellapsed duration since last setup() call.
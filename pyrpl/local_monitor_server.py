@@ -0,0 +1,144 @@
+###############################################################################
+#    pyrpl - DSP servo controller for quantum optics with the RedPitaya
+#    Copyright (C) 2014-2016  Leonhard Neuhaus  (neuhaus@spectro.jussieu.fr)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+Pure-python stand-in for monitor_server.c.
+
+The server speaks the same protocol as the server program running on the
+RedPitaya (commands 'r', 'w', 'c' and the scatter-gather command 'g'),
+but operates on a simulated memory, by default a DummyClient. This allows
+to test MonitorClient and the network protocol without hardware::
+
+    server = LocalMonitorServer()
+    client = MonitorClient("127.0.0.1", server.port, scatter_gather=True)
+"""
+
+import contextlib
+import logging
+import socket
+import struct
+import threading
+
+import numpy as np
+
+from .redpitaya_client import DummyClient
+
+logger = logging.getLogger(name=__name__)
+
+MAX_LENGTH = 65535
+MAX_DESCRIPTORS = 4096
+
+
+class LocalMonitorServer:
+    """Serves the monitor_server protocol on localhost in a daemon thread.
+
+    memory: object with methods reads(addr, length) and writes(addr, values),
+        e.g. a DummyClient (default).
+    port: the port to listen on. 0 picks a free port, available as self.port.
+    """
+
+    def __init__(self, memory=None, port=0):
+        if memory is None:
+            memory = DummyClient()
+        self.memory = memory
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", port))
+        self._socket.listen(5)
+        self.port = self._socket.getsockname()[1]
+        self.requests = 0  # number of headers received, for unittests
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._closed = True
+        with contextlib.suppress(OSError):
+            self._socket.close()
+
+    def _serve(self):
+        # unlike monitor_server.c, keep accepting connections such that
+        # several clients can connect and reconnect after closing
+        while not self._closed:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection):
+        with connection:
+            try:
+                self._handle_requests(connection)
+            except (OSError, ValueError) as e:
+                logger.debug("Connection closed: %s", e)
+
+    def _handle_requests(self, connection):
+        def recv_exactly(n):
+            data = b""
+            while len(data) < n:
+                received = connection.recv(n - len(data))
+                if len(received) == 0:
+                    raise ValueError("connection closed by client")
+                data += received
+            return data
+
+        while True:
+            header = recv_exactly(8)
+            self.requests += 1
+            command, length, address = self._parse(header)
+            if length == 0:
+                continue
+            elif command == b"r":
+                values = self.memory.reads(address, length)
+                connection.sendall(header + np.asarray(values, dtype=np.uint32).tobytes())
+            elif command == b"w":
+                values = np.frombuffer(recv_exactly(4 * length), dtype=np.uint32)
+                self.memory.writes(address, values)
+                connection.sendall(header)
+            elif command == b"g":
+                # for 'g', address holds the total number of values to write
+                if length > MAX_DESCRIPTORS or address > MAX_LENGTH:
+                    raise ValueError("scatter-gather request too long")
+                descriptors = recv_exactly(8 * length)
+                write_data = np.frombuffer(recv_exactly(4 * address), dtype=np.uint32)
+                read_data, write_pos = [], 0
+                for i in range(length):
+                    op, op_length, op_address = self._parse(descriptors[8 * i : 8 * i + 8])
+                    if op == b"r":
+                        read_data.append(self.memory.reads(op_address, op_length))
+                    elif op == b"w":
+                        if write_pos + op_length > address:
+                            raise ValueError("scatter-gather write data too short")
+                        self.memory.writes(
+                            op_address, write_data[write_pos : write_pos + op_length]
+                        )
+                        write_pos += op_length
+                    else:
+                        raise ValueError(f"unknown scatter-gather operation {op}")
+                connection.sendall(
+                    header + b"".join(np.asarray(v, dtype=np.uint32).tobytes() for v in read_data)
+                )
+            elif command == b"c":
+                return
+            else:
+                raise ValueError(f"unknown control character {command}")
+
+    @staticmethod
+    def _parse(header):
+        length, address = struct.unpack("<HI", header[2:8])
+        return header[:1], min(length, MAX_LENGTH), address
@@ -160,20 +160,23 @@ class ModuleMetaClass(type):
             def setup(self, **kwds):
                 self._setup_ongoing = True
                 try:
-                    # user can redefine any setup_attribute through kwds
-                    for key in self._setup_attributes:
-                        if key in kwds:
-                            value = kwds.pop(key)
-                            setattr(self, key, value)
-                    if len(kwds) > 0:
-                        self._logger.warning(
-                            "Trying to load attribute %s of module %s that "
-                            "are invalid setup_attributes.",
-                            sorted(kwds.keys())[0],
-                            self.name,
-                        )
-                    if hasattr(self, "_setup"):
-                        self._setup()
+                    # group all register accesses of the setup into as few
+                    # network round-trips as possible
+                    with self.transaction():
+                        # user can redefine any setup_attribute through kwds
+                        for key in self._setup_attributes:
+                            if key in kwds:
+                                value = kwds.pop(key)
+                                setattr(self, key, value)
+                        if len(kwds) > 0:
+                            self._logger.warning(
+                                "Trying to load attribute %s of module %s that "
+                                "are invalid setup_attributes.",
+                                sorted(kwds.keys())[0],
+                                self.name,
+                            )
+                        if hasattr(self, "_setup"):
+                            self._setup()
                 finally:
                     self._setup_ongoing = False
 
@@ -625,6 +628,15 @@ class Module(metaclass=ModuleMetaClass):
         """
         self.owner = None
 
+    def transaction(self):
+        """
+        Returns a context manager that groups the register accesses
+        performed inside the block (see :obj:`HardwareModule.transaction`).
+        Modules without direct hardware access return a context manager
+        that does nothing.
+        """
+        return contextlib.nullcontext(self)
+
     def _setup(self):
         """
         Sets the module up for acquisition with the current setup attribute
@@ -743,9 +755,18 @@ class HardwareModule(Module):
     attributes:
 
     - addr_base (int): the base address of the module, such as 0x40300000
+
+    Registers listed in _host_owned_registers are only ever modified by the
+    host. Their values are kept in a shadow memory that is updated with
+    every write, such that reading them does not access the hardware. All
+    registers that share an address with a host-owned register are served
+    from the shadow memory, too. Status registers that the FPGA modifies
+    (e.g. scope write pointers, IIR overflow, sampler values) must
+    therefore never share an address with a host-owned register.
     """
 
     parent = None  # parent will be redpitaya instance
+    _host_owned_registers = []
 
     def __init__(self, parent, name=None):
         """Creates the prototype of a RedPitaya Module interface
@@ -755,6 +776,10 @@ class HardwareModule(Module):
         self._client = parent.client
         self._addr_base = self.addr_base
         self._rp = parent
+        self._host_owned_addresses = {
+            getattr(self.__class__, register).address for register in self._host_owned_registers
+        }
+        self._shadow = {}  # address: last value written to host-owned register
         super().__init__(parent, name=name)
         # self.__doc__ = "Available registers: \r\n\r\n" + self.help()
 
@@ -783,14 +808,62 @@ class HardwareModule(Module):
             )
             return 1.0
 
+    def transaction(self):
+        """
+        Returns a context manager that queues all register writes performed
+        inside the block and sends them back-to-back to the Red Pitaya,
+        such that the network round-trip time is only paid once. Register
+        reads inside the block are sent together with the queued writes. ::
+
+            with r.pid0.transaction():
+                r.pid0.p = 1.0
+                r.pid0.i = 100
+                r.pid0.input = 'in1'
+        """
+        return self._client.transaction()
+
+    def _queue_reads(self, addr, length):
+        """queues a read in the current transaction and returns a PendingRead"""
+        return self._client.queue_reads(self._addr_base + addr, length)
+
     def _reads(self, addr, length):
         return self._client.reads(self._addr_base + addr, length)
 
     def _writes(self, addr, values):
         self._client.writes(self._addr_base + addr, values)
+        self._update_shadow(addr, values)
+
+    def _reads_async(self, addr, length):
+        """returns a future for the values at addr, to await in a coroutine"""
+        return self._client.reads_async(self._addr_base + addr, length)
+
+    def _writes_async(self, addr, values):
+        """writes values to addr and returns a future to await in a coroutine"""
+        future = self._client.writes_async(self._addr_base + addr, values)
+        self._update_shadow(addr, values)
+        return future
 
     def _read(self, addr):
-        return int(self._reads(addr, 1)[0])
+        try:
+            return self._shadow[addr]
+        except KeyError:
+            value = int(self._reads(addr, 1)[0])
+            if addr in self._host_owned_addresses:
+                self._shadow[addr] = value
+            return value
+
+    def _update_shadow(self, addr, values):
+        for address in self._host_owned_addresses:
+            index = (address - addr) // 4
+            if 0 <= index < len(values) and address % 4 == addr % 4:
+                self._shadow[address] = int(values[index]) & 0xFFFFFFFF
+
+    def _invalidate_shadow(self):
+        """
+        Forgets the shadow values of the host-owned registers, e.g. after
+        another client or the reload of the FPGA bitfile modified them.
+        """
+        self._shadow.clear()
 
     def _write(self, addr, value):
         self._writes(addr, [int(value)])
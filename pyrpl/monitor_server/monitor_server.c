@@ -53,6 +53,18 @@ If the command is write, the server will wait for 4*n bytes of data from the ser
 If the command is close, or if the connection is broken, the server program will terminate. 
 
 After this, the server will wait for the next command. 
+
+Scatter-gather command 'g': several reads and writes at arbitrary addresses in one request.
+Byte 1 is 'g', byte 2 is reserved.
+Bytes 3+4 are interpreted as unsigned int. This number m is the number of descriptors that follow.
+Bytes 5-8 are interpreted as unsigned int. This number k is the total number of 4-byte-units to be written.
+The header is followed by m descriptors of 8 bytes each, with the same layout as the header:
+    byte 1 is the operation 'r' or 'w', byte 2 is reserved, bytes 3+4 are the number of
+    4-byte-units to read or write, and bytes 5-8 are the start address.
+The descriptors are followed by the k*4 bytes of data for all write descriptors, in descriptor order.
+The operations are executed in descriptor order. The server then sends the 8-byte header back,
+followed by the data of all read descriptors, in descriptor order. Maximum is 2^16 4-byte-units
+read in total, 2^16 4-byte-units written in total and MAX_DESCRIPTORS descriptors per request.
 */
  
  /* for now the program is utterly unoptimized... */
@@ -86,6 +98,7 @@ void error(const char *msg);
 //#define MAP_SIZE 8388608UL
 #define MAP_MASK (MAP_SIZE - 1)
 #define MAX_LENGTH 65535
+#define MAX_DESCRIPTORS 4096
 
 #define DEBUG_MONITOR 0
 
@@ -102,6 +115,10 @@ int fd = -1;
 int sockfd;
 int newsockfd;
 
+//buffers for the scatter-gather command
+char descriptors[8*MAX_DESCRIPTORS];
+unsigned long gather_write_buffer[MAX_LENGTH];
+
 //open and close memory mapping to FPGA registers
 void open_map_base() {
     int addr = 0x40000000;
@@ -230,6 +247,43 @@ int main(int argc, char *argv[])
 			n=send(newsockfd,buffer,8,0);
 			if (n != 8) error("ERROR control sequence mirror incorreclty transmitted");
 		 }
+		 else if (buffer[0] == 'g') { //scatter-gather: list of reads and writes
+			unsigned int n_descriptors = data_length;
+			unsigned long write_length = address; //total number of values to be written
+			unsigned long read_pos = 0;
+			unsigned long write_pos = 0;
+			unsigned int i;
+			if (n_descriptors > MAX_DESCRIPTORS) error("ERROR too many scatter-gather descriptors");
+			if (write_length > MAX_LENGTH) error("ERROR scatter-gather write data too long");
+			//read descriptors and write data from socket
+			n = recv(newsockfd,(void*)descriptors,n_descriptors*8,MSG_WAITALL);
+			if (n != n_descriptors*8) error("ERROR read incorrect number of descriptor bytes from socket");
+			if (write_length > 0) {
+				n = recv(newsockfd,(void*)gather_write_buffer,write_length*sizeof(unsigned long),MSG_WAITALL);
+				if (n != write_length*sizeof(unsigned long)) error("ERROR read incorrect number of bytes from socket");
+			}
+			//execute the operations in descriptor order
+			for (i = 0; i < n_descriptors; i++) {
+				unsigned char* descriptor = (unsigned char*)&(descriptors[8*i]);
+				unsigned long op_length = descriptor[2]+(descriptor[3]<<8);
+				unsigned long op_address = ((unsigned long*)descriptor)[1];
+				if (descriptor[0] == 'r') {
+					if (read_pos + op_length > MAX_LENGTH) error("ERROR scatter-gather read data too long");
+					read_values(op_address, &(rw_buffer[read_pos]), op_length);
+					read_pos += op_length;
+				}
+				else if (descriptor[0] == 'w') {
+					if (write_pos + op_length > write_length) error("ERROR scatter-gather write data too short");
+					write_values(op_address, &(gather_write_buffer[write_pos]), op_length);
+					write_pos += op_length;
+				}
+				else error("ERROR unknown scatter-gather operation - server and client out of sync");
+			}
+			//send the header followed by all read data
+			n = send(newsockfd,(void*)data_buffer,read_pos*sizeof(unsigned long)+8,0);
+			if (n < 0) error("ERROR writing to socket");
+			if (n != read_pos*sizeof(unsigned long)+8) error("ERROR wrote incorrect number of bytes to socket");
+		 }
 		 else if (buffer[0] == 'c') break; //close program
 		 else error("ERROR unknown control character - server and client out of sync"); //if an unknown control sequence is received, terminate for security reasons
 	 }
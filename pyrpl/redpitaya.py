@@ -60,6 +60,8 @@ defaultparameters = dict(
     frequency_correction=1.0,  # actual FPGA frequency is 125 MHz * frequency_correction
     timeout=1,  # timeout in seconds for ssh communication
     monitor_server_name="monitor_server",  # name of the server program on redpitaya
+    scatter_gather=False,  # does the server support the scatter-gather command 'g'?
+    async_client=False,  # use AsyncMonitorClient, whose reads don't block the event loop
     silence_env=False,  # suppress all environment variables that may override the configuration?
     gui=True,  # show graphical user interface or work on command-line only?
 )
@@ -111,6 +113,8 @@ class RedPitaya:
             frequency_correction=1.0,  # actual FPGA frequency is 125 MHz * frequency_correction
             timeout=3,  # timeout in seconds for ssh communication
             monitor_server_name='monitor_server',  # name of the server program on redpitaya
+            scatter_gather=False,  # does the server support the scatter-gather command 'g'?
+            async_client=False,  # use AsyncMonitorClient, whose reads don't block the event loop
             # suppress all environment variables that may override the configuration?
             silence_env=False,
             gui=True  # show graphical user interface or work on command-line only?
@@ -799,10 +803,15 @@ class RedPitaya:
     "LICENSE" in the source directory for details.\r\n""")
 
     def startclient(self):
-        self.client = redpitaya_client.MonitorClient(
+        if self.parameters["async_client"]:
+            client_class = redpitaya_client.AsyncMonitorClient
+        else:
+            client_class = redpitaya_client.MonitorClient
+        self.client = client_class(
             self.parameters["hostname"],
             self.parameters["port"],
             restartserver=self.restartserver,
+            scatter_gather=self.parameters["scatter_gather"],
         )
         self.makemodules()
         self.logger.debug("Client started successfully. ")
@@ -17,8 +17,10 @@
 ###############################################################################
 
 
+import contextlib
 import logging
 import socket
+from collections import deque, namedtuple
 
 import numpy as np
 
@@ -30,6 +32,7 @@ except ImportError:
         print(f"Called sine(frequency={frequency:f}, duration={duration:f})")
 
 
+from .async_utils import LOOP
 from .hardware_modules.dsp import DSP_INPUTS, dsp_addr_base
 from .pyrpl_utils import time
 
@@ -37,14 +40,63 @@ from .pyrpl_utils import time
 # only used for debugging purposes
 CLIENT_NUMBER = 0
 
+# a request queued in a transaction: the 8-byte header, the payload to send
+# after the header, and the PendingRead to fill with the response (or None)
+_Request = namedtuple("_Request", ["header", "payload", "pending"])
+
+# a request sent by AsyncMonitorClient whose response has not arrived yet:
+# the tagged header, the number of values to read, the number of bytes it
+# occupies in the socket buffers, and the future to set with the response
+_InFlight = namedtuple("_InFlight", ["header", "length", "size", "future"])
+
+
+def _completed_future(value):
+    """returns a future of the event loop with result value"""
+    future = LOOP.create_future()
+    future.set_result(value)
+    return future
+
+
+class PendingRead:
+    """Placeholder for the result of a read queued in a client transaction.
+
+    The value becomes available once the client has flushed its queue.
+    Accessing value before that flushes the queue of the client."""
+
+    def __init__(self, client, addr, length):
+        self._client = client
+        self.addr = addr
+        self.length = length
+        self._value = None
+
+    @property
+    def done(self):
+        return self._value is not None
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._client.flush()
+        return self._value
+
 
 class MonitorClient:
-    def __init__(self, hostname="192.168.1.0", port=2222, restartserver=None):
+    # maximum number of bytes (requests + expected responses) that are in
+    # flight at once during a transaction. Above this, the socket buffers of
+    # client and server could fill up and block each other.
+    MAX_PIPELINE_BYTES = 2**15
+    # maximum number of descriptors in one scatter-gather request
+    MAX_DESCRIPTORS = 4096
+
+    def __init__(self, hostname="192.168.1.0", port=2222, restartserver=None, scatter_gather=False):
         """initiates a client connected to monitor_server
 
         hostname: server address, e.g. "localhost" or "192.168.1.0"
         port:    the port that the server is running on. 2222 by default
         restartserver: a function to call that restarts the server in case of problems
+        scatter_gather: whether the server understands the scatter-gather
+            command 'g'. Older server binaries terminate upon unknown
+            commands, so scatter_gather() falls back to a transaction if False.
         """
         self.logger = logging.getLogger(name=__name__)
         # update global client counter and assign a number to this client
@@ -56,8 +108,11 @@ class MonitorClient:
         self._restartserver = restartserver
         self._hostname = hostname
         self._port = port
+        self._scatter_gather = scatter_gather
         self._read_counter = 0  # For debugging and unittests
         self._write_counter = 0  # For debugging and unittests
+        self._transaction_depth = 0  # >0 while inside a transaction
+        self._queue = []  # requests waiting to be sent by flush()
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # Register accesses use very small request/response packets. Without
         # TCP_NODELAY, Windows and newer Linux TCP stacks can combine Nagle's
@@ -104,20 +159,234 @@ class MonitorClient:
         self._read_counter += 1
         if hasattr(self, "_sound_debug") and self._sound_debug:
             sine(440, 0.05)
+        if self._transaction_depth > 0:
+            # the caller needs the value right away: send it together with
+            # all queued writes in one go
+            return self.queue_reads(addr, length).value
         return self.try_n_times(self._reads, addr, length)
 
     def writes(self, addr, values):
         self._write_counter += 1
         if hasattr(self, "_sound_debug") and self._sound_debug:
             sine(880, 0.05)
+        if self._transaction_depth > 0:
+            values = values[: 65535 - 2]
+            self._queue.append(
+                _Request(
+                    self._header(b"w", addr, len(values)),
+                    np.array(values, dtype=np.uint32).tobytes(),
+                    None,
+                )
+            )
+            return True
         return self.try_n_times(self._writes, addr, values)
 
-    # the actual code
-    def _reads(self, addr, length):
+    # awaitable versions of reads and writes. MonitorClient executes them
+    # right away, AsyncMonitorClient keeps the event loop running instead
+    def reads_async(self, addr, length):
+        """returns a future for the values at addr"""
+        return _completed_future(self.reads(addr, length))
+
+    def writes_async(self, addr, values):
+        """writes values to addr and returns a future"""
+        return _completed_future(self.writes(addr, values))
+
+    # transactions: many requests are sent back-to-back, and all responses
+    # are collected afterwards, such that the network round-trip time is
+    # only paid once per transaction instead of once per register access
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Context manager that queues all writes issued inside the block
+        and sends them back-to-back when the block is left. Reads issued
+        inside the block are sent together with all queued writes. Use
+        queue_reads() to collect several reads in one round-trip, too.
+
+        Transactions can be nested, the queue is flushed when the
+        outermost transaction ends.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.flush()
+
+    def queue_reads(self, addr, length):
+        """
+        Queues a read of length values at addr and returns a PendingRead.
+        Its value is available after the next flush() (which is called
+        automatically when the value is accessed or the transaction ends).
+        """
         if length > 65535:
             length = 65535
             self.logger.warning("Maximum read-length is %d", length)
-        header = b"r" + bytes(
+        pending = PendingRead(self, addr, length)
+        self._queue.append(_Request(self._header(b"r", addr, length), b"", pending))
+        return pending
+
+    def flush(self):
+        """sends all queued requests and collects their responses"""
+        batch, self._queue = self._queue, []
+        if len(batch) == 0:
+            return
+        for i in range(5):
+            try:
+                if self._send_batch(batch):
+                    return
+            except (OSError, socket.timeout):
+                self.logger.error(
+                    f"Error occured in transaction attempt {i} with {len(batch)} "
+                    f"requests by client {self.client_number}. Reconnecting..."
+                )
+                if self._restartserver is not None:
+                    self.restart()
+
+    def _send_batch(self, batch):
+        start = 0
+        while start < len(batch):
+            # chunk the batch such that socket buffers cannot overflow
+            stop, size = start, 0
+            while stop < len(batch):
+                request = batch[stop]
+                request_size = 16 + len(request.payload)
+                if request.pending is not None:
+                    request_size += 4 * request.pending.length
+                if stop > start and size + request_size > self.MAX_PIPELINE_BYTES:
+                    break
+                size += request_size
+                stop += 1
+            chunk = batch[start:stop]
+            self.socket.sendall(b"".join(r.header + r.payload for r in chunk))
+            for request in chunk:
+                length = 0 if request.pending is None else request.pending.length
+                data = self._recv_exactly(length * 4 + 8)
+                if data[:8] != request.header:  # check for in-sync transmission
+                    self.logger.error("Wrong control sequence from server: %s", data[:8])
+                    self.emptybuffer()
+                    return False
+                if request.pending is not None:
+                    request.pending._value = np.frombuffer(data[8:], dtype=np.uint32)
+            start = stop
+        return True
+
+    def scatter_gather(self, operations):
+        """
+        Executes a list of reads and writes in a single request and returns
+        the results in the same order.
+
+        operations: list of tuples ("r", addr, length) or ("w", addr, values)
+
+        Returns a list with a numpy array for each read and None for each
+        write. Example::
+
+            pointer, trigger, nadata = client.scatter_gather(
+                [("r", 0x40100018, 1), ("r", 0x4010001C, 1), ("r", 0x40500140, 4)])
+        """
+        operations = [self._descriptor(*operation) for operation in operations]
+        if not self._scatter_gather:
+            with self.transaction():
+                results = [
+                    self.queue_reads(addr, arg) if op == b"r" else self.writes(addr, arg)
+                    for op, addr, arg in operations
+                ]
+            return [
+                result.value if op == b"r" else None
+                for (op, _, _), result in zip(operations, results)
+            ]
+        self._read_counter += sum(1 for op, _, _ in operations if op == b"r")
+        self._write_counter += sum(1 for op, _, _ in operations if op == b"w")
+        # requests queued in an enclosing transaction must go out first
+        self.flush()
+        results = []
+        for chunk in self._scatter_gather_chunks(operations):
+            for i in range(5):
+                try:
+                    chunk_results = self._send_scatter_gather(chunk)
+                except (OSError, socket.timeout):
+                    self.logger.error(
+                        f"Error occured in scatter-gather attempt {i} with {len(chunk)} "
+                        f"operations by client {self.client_number}. Reconnecting..."
+                    )
+                    if self._restartserver is not None:
+                        self.restart()
+                else:
+                    if chunk_results is not None:
+                        break
+            else:
+                chunk_results = [None] * len(chunk)
+            results.extend(chunk_results)
+        return results
+
+    def _descriptor(self, op, addr, arg):
+        if op == "r":
+            if arg > 65535:
+                arg = 65535
+                self.logger.warning("Maximum read-length is %d", arg)
+            return b"r", addr, arg
+        elif op == "w":
+            return b"w", addr, np.array(arg, dtype=np.uint32)[: 65535 - 2]
+        else:
+            raise ValueError(f"Unknown scatter-gather operation {op!r}, must be 'r' or 'w'.")
+
+    def _scatter_gather_chunks(self, operations):
+        """splits operations into chunks that respect the server limits"""
+        chunk, read_length, write_length = [], 0, 0
+        for op, addr, arg in operations:
+            length = arg if op == b"r" else len(arg)
+            read = length if op == b"r" else 0
+            write = length if op == b"w" else 0
+            if len(chunk) > 0 and (
+                len(chunk) >= self.MAX_DESCRIPTORS
+                or read_length + read > 65535
+                or write_length + write > 65535
+            ):
+                yield chunk
+                chunk, read_length, write_length = [], 0, 0
+            chunk.append((op, addr, arg))
+            read_length += read
+            write_length += write
+        if len(chunk) > 0:
+            yield chunk
+
+    def _send_scatter_gather(self, operations):
+        descriptors = []
+        payload = []
+        read_length = 0
+        for op, addr, arg in operations:
+            if op == b"r":
+                descriptors.append(self._header(b"r", addr, arg))
+                read_length += arg
+            else:
+                descriptors.append(self._header(b"w", addr, len(arg)))
+                payload.append(arg.tobytes())
+        write_length = sum(len(p) for p in payload) // 4
+        header = self._header(b"g", write_length, len(descriptors))
+        self.socket.sendall(header + b"".join(descriptors) + b"".join(payload))
+        data = self._recv_exactly(read_length * 4 + 8)
+        if data[:8] != header:  # check for in-sync transmission
+            self.logger.error("Wrong control sequence from server: %s", data[:8])
+            self.emptybuffer()
+            return None
+        values = np.frombuffer(data[8:], dtype=np.uint32)
+        results, start = [], 0
+        for op, _, arg in operations:
+            if op == b"r":
+                results.append(values[start : start + arg])
+                start += arg
+            else:
+                results.append(None)
+        return results
+
+    def _recv_exactly(self, n):
+        data = self.socket.recv(n)
+        while len(data) < n:
+            data += self.socket.recv(n - len(data))
+        return data
+
+    def _header(self, command, addr, length):
+        return command + bytes(
             bytearray(
                 [
                     0,
@@ -130,6 +399,13 @@ class MonitorClient:
                 ]
             )
         )
+
+    # the actual code
+    def _reads(self, addr, length):
+        if length > 65535:
+            length = 65535
+            self.logger.warning("Maximum read-length is %d", length)
+        header = self._header(b"r", addr, length)
         self.socket.send(header)
         data = self.socket.recv(length * 4 + 8)
         while len(data) < length * 4 + 8:
@@ -143,20 +419,7 @@ class MonitorClient:
 
     def _writes(self, addr, values):
         values = values[: 65535 - 2]
-        length = len(values)
-        header = b"w" + bytes(
-            bytearray(
-                [
-                    0,
-                    length & 0xFF,
-                    (length >> 8) & 0xFF,
-                    addr & 0xFF,
-                    (addr >> 8) & 0xFF,
-                    (addr >> 16) & 0xFF,
-                    (addr >> 24) & 0xFF,
-                ]
-            )
-        )
+        header = self._header(b"w", addr, len(values))
         # send header+body
         self.socket.send(header + np.array(values, dtype=np.uint32).tobytes())
         if self.socket.recv(8) == header:  # check for in-sync transmission
@@ -192,7 +455,174 @@ class MonitorClient:
     def restart(self):
         self.close()
         port = self._restartserver()
-        self.__init__(hostname=self._hostname, port=port, restartserver=self._restartserver)
+        transaction_depth = self._transaction_depth
+        self.__init__(
+            hostname=self._hostname,
+            port=port,
+            restartserver=self._restartserver,
+            scatter_gather=self._scatter_gather,
+        )
+        self._transaction_depth = transaction_depth
+
+
+class AsyncMonitorClient(MonitorClient):
+    """MonitorClient whose reads and writes can be awaited in coroutines.
+
+    reads_async() and writes_async() send their request right away and
+    return a future. Several requests can be in flight at the same time.
+    Each request is tagged in the reserved header byte, which the server
+    echoes, and the responses are dispatched to the futures by a reader
+    callback of the event loop. Therefore the event loop (and the gui)
+    keeps running while the data is on its way::
+
+        async def acquire(client):
+            ch1 = client.reads_async(0x40110000, 2**14)
+            ch2 = client.reads_async(0x40120000, 2**14)
+            return await ch1, await ch2
+
+    The synchronous methods of MonitorClient remain available. They first
+    collect the responses of all requests in flight.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._inflight = deque()  # requests waiting for their response
+        self._inflight_bytes = 0
+        self._rxbuffer = b""  # received bytes of incomplete responses
+        self._tag = 0
+        self._reader_fd = None
+        super().__init__(*args, **kwargs)
+
+    def reads_async(self, addr, length):
+        self._read_counter += 1
+        if length > 65535:
+            length = 65535
+            self.logger.warning("Maximum read-length is %d", length)
+        return self._request(self._tagged_header(b"r", addr, length), b"", length)
+
+    def writes_async(self, addr, values):
+        self._write_counter += 1
+        values = np.array(values[: 65535 - 2], dtype=np.uint32)
+        return self._request(self._tagged_header(b"w", addr, len(values)), values.tobytes(), 0)
+
+    def _tagged_header(self, command, addr, length):
+        # tags 1-255 identify in-flight requests, 0 is used by the sync methods
+        self._tag = self._tag % 255 + 1
+        header = self._header(command, addr, length)
+        return header[:1] + bytes([self._tag]) + header[2:]
+
+    def _request(self, header, payload, length):
+        # writes queued in a transaction must reach the server first
+        self.flush()
+        size = 16 + len(payload) + 4 * length
+        while self._inflight and (
+            len(self._inflight) >= 255 or self._inflight_bytes + size > self.MAX_PIPELINE_BYTES
+        ):
+            # wait for responses such that tags are unique and the socket
+            # buffers of client and server cannot block each other
+            self._receive(self._recv_some())
+        future = LOOP.create_future()
+        self._inflight.append(_InFlight(header, length, size, future))
+        self._inflight_bytes += size
+        try:
+            self.socket.sendall(header + payload)
+        except OSError as e:
+            self._fail_inflight(e)
+            return future
+        self._watch()
+        return future
+
+    def _watch(self):
+        if self._reader_fd is not None:
+            return
+        try:
+            LOOP.add_reader(self.socket.fileno(), self._on_readable)
+        except NotImplementedError:  # event loops without add_reader
+            self._complete_inflight()
+        else:
+            self._reader_fd = self.socket.fileno()
+
+    def _unwatch(self):
+        if self._reader_fd is not None:
+            LOOP.remove_reader(self._reader_fd)
+            self._reader_fd = None
+
+    def _on_readable(self):
+        try:
+            data = self._recv_some()
+        except (BlockingIOError, socket.timeout):
+            return
+        except OSError as e:
+            self._fail_inflight(e)
+        else:
+            self._receive(data)
+
+    def _recv_some(self):
+        data = self.socket.recv(65536)
+        if len(data) == 0:
+            raise ConnectionError("Connection closed by server")
+        return data
+
+    def _receive(self, data):
+        """dispatches all complete responses in data to their futures"""
+        self._rxbuffer += data
+        while self._inflight:
+            request = self._inflight[0]
+            n = 8 + 4 * request.length
+            if len(self._rxbuffer) < n:
+                break
+            response, self._rxbuffer = self._rxbuffer[:n], self._rxbuffer[n:]
+            if response[:8] != request.header:  # check for in-sync transmission
+                self.logger.error("Wrong control sequence from server: %s", response[:8])
+                self._fail_inflight(ConnectionError("Server and client out of sync"))
+                return
+            self._inflight.popleft()
+            self._inflight_bytes -= request.size
+            if not request.future.done():  # the future may have been cancelled
+                if request.header[:1] == b"w":
+                    request.future.set_result(True)
+                else:
+                    request.future.set_result(np.frombuffer(response[8:], dtype=np.uint32))
+        if not self._inflight:
+            self._unwatch()
+
+    def _complete_inflight(self):
+        """blocks until the responses of all requests in flight arrived"""
+        while self._inflight:
+            self._receive(self._recv_some())
+
+    def _fail_inflight(self, exception):
+        for request in self._inflight:
+            if not request.future.done():
+                request.future.set_exception(exception)
+        self._inflight.clear()
+        self._inflight_bytes = 0
+        self._rxbuffer = b""
+        self._unwatch()
+
+    # the synchronous requests must wait until the socket is free
+    def _reads(self, addr, length):
+        self._complete_inflight()
+        return super()._reads(addr, length)
+
+    def _writes(self, addr, values):
+        self._complete_inflight()
+        return super()._writes(addr, values)
+
+    def _send_batch(self, batch):
+        self._complete_inflight()
+        return super()._send_batch(batch)
+
+    def _send_scatter_gather(self, operations):
+        self._complete_inflight()
+        return super()._send_scatter_gather(operations)
+
+    def close(self):
+        self._fail_inflight(ConnectionError("Client closed"))
+        super().close()
+
+    def restart(self):
+        self._fail_inflight(ConnectionError("Client restarted"))
+        super().restart()
 
 
 class DummyClient:  # pragma: no cover
@@ -281,6 +711,30 @@ class DummyClient:  # pragma: no cover
         for i, v in enumerate(values):
             self.fpgamemory[str(addr + 0x4 * i)] = v
 
+    def reads_async(self, addr, length):
+        return _completed_future(self.reads(addr, length))
+
+    def writes_async(self, addr, values):
+        return _completed_future(self.writes(addr, values))
+
+    @contextlib.contextmanager
+    def transaction(self):
+        yield self
+
+    def queue_reads(self, addr, length):
+        pending = PendingRead(self, addr, length)
+        pending._value = self.reads(addr, length)
+        return pending
+
+    def flush(self):
+        pass
+
+    def scatter_gather(self, operations):
+        return [
+            self.reads(addr, arg) if op == "r" else self.writes(addr, arg)
+            for op, addr, arg in operations
+        ]
+
     def restart(self):
         pass
 
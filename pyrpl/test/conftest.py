@@ -44,6 +44,7 @@ def pytest_collection_modifyitems(session, config, items):
             "test_redpitaya.py",
             "test_pyqtgraph_benchmark.py",
             "test_registers.py",
+            "test_monitor_client.py",
         ]:
             found_heavy_test = True
 
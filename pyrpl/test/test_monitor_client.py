@@ -0,0 +1,105 @@
+# unitary test for the MonitorClient network protocol against a local
+# pure-python stand-in for monitor_server.c
+import logging
+
+import numpy as np
+import pytest
+
+from ..async_utils import ensure_future, wait
+from ..local_monitor_server import LocalMonitorServer
+from ..redpitaya_client import AsyncMonitorClient, DummyClient, MonitorClient
+
+logger = logging.getLogger(name=__name__)
+
+
+class TestMonitorClient:
+    @pytest.fixture(autouse=True)
+    def setup_server(self):
+        self.server = LocalMonitorServer()
+        self.client = MonitorClient("127.0.0.1", self.server.port, scatter_gather=True)
+        yield
+        self.client.close()
+        self.server.close()
+
+    def test_reads_writes(self):
+        self.client.writes(0x40000000, [1, 2, 3])
+        assert (self.client.reads(0x40000000, 3) == [1, 2, 3]).all()
+
+    def test_transaction(self):
+        with self.client.transaction():
+            for i in range(100):
+                self.client.writes(0x40000000 + 4 * i, [i])
+            pending = [self.client.queue_reads(0x40000000 + 4 * i, 1) for i in range(100)]
+        assert [p.value[0] for p in pending] == list(range(100))
+
+    def test_scatter_gather(self):
+        requests = self.server.requests
+        results = self.client.scatter_gather(
+            [
+                ("w", 0x40000010, [7, 8]),
+                ("r", 0x40000010, 2),
+                ("w", 0x40400000, [9]),
+                ("r", 0x40400000, 1),
+            ]
+        )
+        # all operations in a single request, executed in order
+        assert self.server.requests == requests + 1
+        assert results[0] is None and results[2] is None
+        assert (results[1] == [7, 8]).all()
+        assert results[3][0] == 9
+
+    def test_scatter_gather_chunks(self):
+        n = MonitorClient.MAX_DESCRIPTORS + 10
+        self.client.scatter_gather([("w", 0x40000000 + 4 * i, [i]) for i in range(n)])
+        results = self.client.scatter_gather([("r", 0x40000000 + 4 * i, 1) for i in range(n)])
+        assert np.concatenate(results).tolist() == list(range(n))
+
+    def test_scatter_gather_fallback(self):
+        # without server support, the same operations go through a transaction
+        client = MonitorClient("127.0.0.1", self.server.port, scatter_gather=False)
+        try:
+            results = client.scatter_gather([("w", 0x40000020, [5]), ("r", 0x40000020, 1)])
+            assert results[0] is None
+            assert results[1][0] == 5
+        finally:
+            client.close()
+
+    def test_dummy_client(self):
+        results = DummyClient().scatter_gather([("w", 0x40000030, [4]), ("r", 0x40000030, 1)])
+        assert results[0] is None
+        assert results[1][0] == 4
+
+    def test_async_client(self):
+        client = AsyncMonitorClient("127.0.0.1", self.server.port)
+
+        async def acquire():
+            write = client.writes_async(0x40000040, [1, 2])
+            read1 = client.reads_async(0x40000040, 2)
+            read2 = client.reads_async(0x40000044, 1)
+            # all requests are in flight before the first response is awaited
+            assert len(client._inflight) == 3
+            return await write, await read1, await read2
+
+        try:
+            written, read1, read2 = wait(ensure_future(acquire()), 10)
+            assert written is True
+            assert read1.tolist() == [1, 2]
+            assert read2.tolist() == [2]
+        finally:
+            client.close()
+
+    def test_async_client_sync_access(self):
+        client = AsyncMonitorClient("127.0.0.1", self.server.port)
+
+        async def mixed():
+            client.writes(0x40000050, [3])
+            pending = client.reads_async(0x40000050, 1)
+            # synchronous access collects the responses in flight first
+            assert client.reads(0x40000050, 1)[0] == 3
+            assert pending.done()
+            return (await pending)[0]
+
+        try:
+            assert wait(ensure_future(mixed()), 10) == 3
+        finally:
+            client.close()
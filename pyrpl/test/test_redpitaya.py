@@ -27,3 +27,30 @@ class TestRedpitaya:
     def test_connect(self):
         self.r.hk.led = 0
         assert self.r.hk.led == 0
+
+    def test_transaction(self):
+        pid = self.r.pid0
+        with pid.transaction():
+            pid.p = 0.5
+            pid.setpoint = 0.25
+            pending = pid._queue_reads(0x104, 1)
+        assert pending.done
+        assert pid.p == 0.5
+        assert pid.setpoint == 0.25
+        with self.r.hk.transaction():
+            self.r.hk.led = 3
+            # reads inside a transaction see the queued writes
+            assert self.r.hk.led == 3
+        self.r.hk.led = 0
+
+    def test_shadow_registers(self):
+        pid = self.r.pid0
+        pid.p = 0.25
+        # modify the register behind the back of the module
+        self.r.client.writes(pid._addr_base + 0x108, [0])
+        # host-owned registers are served from the shadow memory
+        assert pid.p == 0.25
+        pid._invalidate_shadow()
+        assert pid.p == 0
+        # the integrator value is modified by the fpga and never shadowed
+        assert 0x100 not in pid._host_owned_addresses